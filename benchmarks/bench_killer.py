@@ -0,0 +1,131 @@
+"""Killer Sudoku: cage propagators versus the binary encoding.
+
+The binary (hidden variable) encoding gives each cage an extra variable
+whose domain is every tuple of different digits with the right total,
+linked to each cell of the cage by a binary arc.  The propagator encoding
+is csp_lib.killer.KillerSudoku.  From the same givens the initial AC3
+of both reaches the same domains, so its time is the cost of the two ways
+of propagating.  The searches do not explore the same tree, though, even
+with the same deterministic variable order (smallest domain first, ties
+by cell number): KillerSudoku also fails a branch as soon as a digit has
+no cell left in some unit (see the unit counts of csp_lib.sudoku), which
+the binary encoding only finds out later.  So the number of assignments
+differs, and the search is compared per assignment instead: seconds of
+search divided by assignments, the cost of propagating at one node.  For
+each puzzle this reports the number of arcs, the time of the initial AC3,
+and the assignments of a full search with mac and its microseconds per
+assignment.
+
+    python benchmarks/bench_killer.py [count] [seed]
+    python benchmarks/bench_killer.py --file puzzles.jsonl
+
+A puzzle file holds one puzzle per line as a JSON list of
+[total, [positions...]] cages, positions 0..80 row by row.  Without a file,
+puzzles are random grids cut into cages of 2-4 cells.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from itertools import permutations
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'sudoku-for-students'))
+
+from csp_lib.csp import CSP
+from csp_lib.sudoku import Sudoku, flatten
+from csp_lib.killer import KillerSudoku, random_cages
+from csp_lib.generator import EMPTY, random_solution
+from csp_lib.constraint_prop import AC3
+from csp_lib.backtrack import backtracking_search
+from csp_lib.backtrack_util import mac, unordered_domain_values
+
+CELLS = Sudoku(EMPTY).variables
+
+
+def binary_encoding(cages):
+    """Killer Sudoku as a binary CSP with one hidden variable per cage."""
+    s = Sudoku(EMPTY)
+    cells = flatten(s.rows)
+    variables = list(s.variables)
+    domains = dict(s.domains)
+    neighbors = {v: set(n) for v, n in s.neighbors.items()}
+    position = {}       # (hidden, cell) -> index of cell in the hidden tuples
+    for i, (total, positions) in enumerate(cages):
+        hidden = ('cage', i)
+        members = [cells[p] for p in positions]
+        variables.append(hidden)
+        domains[hidden] = [t for t in permutations('123456789', len(members))
+                           if sum(map(int, t)) == total]
+        neighbors[hidden] = set(members)
+        for k, cell in enumerate(members):
+            neighbors[cell].add(hidden)
+            position[(hidden, cell)] = k
+
+    def constraint(A, a, B, b):
+        if (A, B) in position:
+            return a[position[(A, B)]] == b
+        if (B, A) in position:
+            return b[position[(B, A)]] == a
+        return a != b
+
+    return CSP(variables, domains, neighbors, constraint)
+
+
+def smallest_cell(assignment, csp):
+    """Deterministic minimum-remaining-values over the Sudoku cells."""
+    return min((v for v in CELLS if v not in assignment),
+               key=lambda v: len(csp.curr_domains[v]))
+
+
+def measure(csp):
+    """Return (arcs, AC3 seconds, search seconds, assignments) for csp."""
+    arcs = sum(len(n) for n in csp.neighbors.values())
+    start = time.perf_counter()
+    ok = AC3(csp)
+    ac3 = time.perf_counter() - start
+    start = time.perf_counter()
+    if ok:
+        result = backtracking_search(csp, smallest_cell, unordered_domain_values, mac)
+        assert result != "Failure"
+    return arcs, ac3, time.perf_counter() - start, csp.nassigns
+
+
+def per_assignment(seconds, assigns):
+    """Microseconds of search per assignment."""
+    return 1e6 * seconds / max(assigns, 1)
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--file':
+        with open(sys.argv[2]) as f:
+            puzzles = [json.loads(line) for line in f if line.strip()]
+    else:
+        count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+        random.seed(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+        puzzles = [random_cages(random_solution()) for _ in range(count)]
+
+    print("{:<8}{:>8}{:>10}{:>9}{:>10}   {:>8}{:>10}{:>9}{:>10}".format(
+        'puzzle', 'arcs', 'AC3 s', 'assigns', 'us/assign',
+        'arcs', 'AC3 s', 'assigns', 'us/assign'))
+    print("{:<8}{:^37}   {:^37}".format('', 'cage propagators', 'binary encoding'))
+    totals = [[0.0, 0.0, 0], [0.0, 0.0, 0]]    # AC3 s, search s, assigns
+    for i, cages in enumerate(puzzles):
+        results = (measure(KillerSudoku(cages)), measure(binary_encoding(cages)))
+        row = []
+        for total, (arcs, ac3, search, assigns) in zip(totals, results):
+            total[0] += ac3
+            total[1] += search
+            total[2] += assigns
+            row += [arcs, ac3, assigns, per_assignment(search, assigns)]
+        print("{:<8}{:>8}{:>10.3f}{:>9}{:>10.1f}   {:>8}{:>10.3f}{:>9}{:>10.1f}".format(
+            i, *row))
+    print("initial AC3 seconds: propagators {:.3f}, binary {:.3f}".format(
+        totals[0][0], totals[1][0]))
+    print("search us/assignment: propagators {:.1f}, binary {:.1f}".format(
+        per_assignment(*totals[0][1:]), per_assignment(*totals[1][1:])))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Transposition table for propagation under restarts.
+
+Solves each puzzle several times from the same arc consistent state, as
+a restarting or portfolio solver would, with and without memo.memoize,
+and reports assignments, time and the table's hit rate.  The restarts
+cycle through a few seeds, so later runs revisit the states of earlier
+ones.  Run from the repository root:
+
+    python benchmarks/bench_memo.py [restarts] [seeds]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'sudoku-for-students'))
+
+from csp_lib.sudoku import Sudoku
+from csp_lib.constraint_prop import AC3
+from csp_lib.backtrack import backtracking_search
+from csp_lib.backtrack_util import mrv, unordered_domain_values, mac
+from csp_lib.memo import memoize
+
+from bench_search import PUZZLES
+
+
+def run(memo, restarts, seeds):
+    nodes = 0
+    seconds = 0.0
+    hits = lookups = 0
+    for puzzle in PUZZLES:
+        s = Sudoku(puzzle)
+        start = time.perf_counter()
+        if AC3(s):
+            table = memoize(s) if memo else None
+            snap = s.snapshot()
+            for i in range(restarts):
+                random.seed(i % seeds)
+                s.restore_snapshot(snap)
+                backtracking_search(s, mrv, unordered_domain_values, mac)
+            if table is not None:
+                hits += table.hits
+                lookups += table.hits + table.misses
+        seconds += time.perf_counter() - start
+        nodes += s.nassigns
+    return nodes, seconds, hits / lookups if lookups else 0.0
+
+
+def main():
+    restarts = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    seeds = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    print("{} restarts over {} seeds".format(restarts, seeds))
+    print("{:<10}{:>10}{:>10}{:>10}".format('memo', 'nodes', 'seconds', 'hit rate'))
+    for memo in (False, True):
+        nodes, seconds, hit_rate = run(memo, restarts, seeds)
+        print("{:<10}{:>10}{:>10.3f}{:>10.2f}".format(
+            'on' if memo else 'off', nodes, seconds, hit_rate))
+
+
+if __name__ == '__main__':
+    main()
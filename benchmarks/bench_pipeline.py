@@ -0,0 +1,89 @@
+"""Mean latency of the adaptive pipeline on mixed traffic.
+
+Generates puzzles of every generator level (or reads them, one grid per
+line), records every stage of adaptive_solve on the first half as JSON
+lines, learns thresholds from that, and compares on the second half:
+
+    fixed      AC3 then backtracking_search with mac (the old driver.py)
+    every      adaptive_solve running every stage (thresholds {})
+    learned    adaptive_solve with the thresholds learned here
+    default    adaptive_solve with DEFAULT_THRESHOLDS
+
+Run from the repository root:
+
+    python benchmarks/bench_pipeline.py [puzzle file] [--per-level N]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'sudoku-for-students'))
+
+from csp_lib.sudoku import Sudoku
+from csp_lib.constraint_prop import AC3
+from csp_lib.backtrack import backtracking_search
+from csp_lib.backtrack_util import mrv, unordered_domain_values, mac
+from csp_lib.generator import LEVELS, generate_many
+from csp_lib.pipeline import DEFAULT_THRESHOLDS, adaptive_solve, learn_thresholds
+from csp_lib.results import ResultWriter, result_record
+
+
+def fixed(s):
+    if AC3(s) and len(s.infer_assignment()) < len(s.variables):
+        backtracking_search(s, mrv, unordered_domain_values, mac)
+
+
+def mean_ms(puzzles, solve):
+    seconds = 0.0
+    for i, puzzle in enumerate(puzzles):
+        random.seed(i)
+        s = Sudoku(puzzle)
+        start = time.perf_counter()
+        solve(s)
+        seconds += time.perf_counter() - start
+    return 1000 * seconds / len(puzzles)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('puzzles', nargs='?')
+    parser.add_argument('--per-level', type=int, default=20)
+    args = parser.parse_args()
+    if args.puzzles:
+        with open(args.puzzles) as f:
+            puzzles = [line.strip() for line in f if line.strip()]
+    else:
+        puzzles = [puzzle for level in LEVELS
+                   for puzzle, _level in generate_many(args.per_level, level, seed=1)]
+    random.Random(0).shuffle(puzzles)
+    half = len(puzzles) // 2
+    train, test = puzzles[:half], puzzles[half:]
+
+    out = io.StringIO()
+    with ResultWriter(out) as writer:
+        for puzzle in train:
+            s = Sudoku(puzzle)
+            start = time.perf_counter()
+            assignment, level, stages = adaptive_solve(s, {})
+            writer.write(result_record(puzzle, s.to_string(assignment),
+                                       time.perf_counter() - start, s.nassigns,
+                                       level, stages))
+    thresholds = learn_thresholds(json.loads(line) for line in out.getvalue().splitlines())
+    print("learned thresholds:", thresholds)
+
+    print("{:<10}{:>12}".format('solver', 'mean ms'))
+    for name, solve in [('fixed', fixed),
+                        ('every', lambda s: adaptive_solve(s, {})),
+                        ('learned', lambda s: adaptive_solve(s, thresholds)),
+                        ('default', lambda s: adaptive_solve(s, DEFAULT_THRESHOLDS))]:
+        print("{:<10}{:>12.2f}".format(name, mean_ms(test, solve)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Search cost per node.
+
+Solves a set of puzzles with backtracking_search (mrv ordering) under
+each inference and reports assignments (search nodes), total time and
+time per node.  Run from the repository root:
+
+    python benchmarks/bench_search.py [puzzle file]
+
+A puzzle file has one 81 character grid per line, e.g. the output of
+csp_lib.generator.  By default a few well known hard puzzles are used.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'sudoku-for-students'))
+
+from csp_lib.sudoku import Sudoku, harder1
+from csp_lib.constraint_prop import AC3
+from csp_lib.backtrack import backtracking_search
+from csp_lib.backtrack_util import mrv, unordered_domain_values, mac, mac_unit_rules
+
+PUZZLES = [
+    harder1,
+    '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..',
+    '..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..',
+    '.......39.....1..5..3.5.8....8.9...6.7...2...1..4.......9.8..5..2....6..4..7.....',
+    '1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..',
+]
+
+INFERENCES = [mac, mac_unit_rules]
+
+
+def main():
+    puzzles = PUZZLES
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            puzzles = [line.strip() for line in f if line.strip()]
+
+    print("{:<18}{:>10}{:>10}{:>14}".format('inference', 'nodes', 'seconds', 'us per node'))
+    for inference in INFERENCES:
+        nodes = 0
+        seconds = 0.0
+        for i, puzzle in enumerate(puzzles):
+            random.seed(i)
+            s = Sudoku(puzzle)
+            start = time.perf_counter()
+            if AC3(s):
+                backtracking_search(s, mrv, unordered_domain_values, inference)
+            seconds += time.perf_counter() - start
+            nodes += s.nassigns
+        print("{:<18}{:>10}{:>10.3f}{:>14.1f}".format(
+            inference.__name__, nodes, seconds, 1e6 * seconds / max(nodes, 1)))
+
+
+if __name__ == '__main__':
+    main()
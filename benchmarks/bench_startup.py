@@ -0,0 +1,50 @@
+"""Startup cost of the solver.
+
+Times fresh interpreters that import csp_lib modules (and one that solves
+a puzzle through the command line entry point), since short-lived jobs pay
+this on every run.  Run from the repository root:
+
+    python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ('python', 'pass'),
+    ('import csp_lib', 'import csp_lib'),
+    ('import csp_lib.sudoku', 'import csp_lib.sudoku'),
+    ('import csp_lib.cli', 'import csp_lib.cli'),
+    ('import csp_lib.generator', 'import csp_lib.generator'),
+    ('solve easy1', 'from csp_lib.cli import main; from csp_lib.sudoku import easy1; '
+                    'main([easy1])'),
+]
+
+
+def run(code, runs):
+    """Median wall time in milliseconds of runs fresh interpreters running code."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.join(ROOT, 'sudoku-for-students'), env.get('PYTHONPATH', '')])
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for name, code in CASES:
+        print("{:<28}{:8.1f} ms".format(name, run(code, runs)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+"""Constraint satisfaction problems and Sudoku.
+
+Submodules are imported on first use, so that `import csp_lib` stays cheap
+for short-lived command line runs.  In particular the process pool based
+modules (generator, portfolio, split) are only loaded when asked for.
+"""
+
+import importlib
+
+_SUBMODULES = ('assignment', 'backtrack', 'backtrack_util', 'cli', 'constraint_prop', 'csp',
+               'generator', 'killer', 'memo', 'pipeline', 'portfolio', 'problem',
+               'results', 'split', 'sudoku', 'util')
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
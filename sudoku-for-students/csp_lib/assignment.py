@@ -0,0 +1,93 @@
+# ______________________________________________________________________________
+# Array backed assignments
+
+class ArrayAssignment:
+    """An assignment {var: val} for a CSP whose variables are the integers
+    0..nvars-1 (such as Sudoku cells), stored in a flat list instead of a
+    dict.  It supports the dict operations the search code uses: in,
+    [], get, del, len, keys and items.
+
+    It also knows the units of the problem, groups of variables that must
+    take different values.  For each unit and value it counts the assigned
+    variables of the unit holding the value, so conflicts(var, val) is a
+    constant time check, and len() is a counter.  Counts rather than bits
+    are kept so that a clash (two variables with one value, which
+    propagation can create for a moment before it fails) is undone
+    correctly.
+
+    nvars - number of variables
+    var_units - var_units[var] lists the indices of the units of var
+    nunits - number of units
+    value_index - {value: i} numbering the values from 0
+    """
+
+    def __init__(self, nvars, var_units, nunits, value_index):
+        self.values = [None] * nvars
+        self.nassigned = 0
+        self.var_units = var_units
+        self.value_index = value_index
+        self.nvalues = len(value_index)
+        self.used = [0] * (nunits * self.nvalues)
+
+    def __len__(self):
+        return self.nassigned
+
+    def __contains__(self, var):
+        return self.values[var] is not None
+
+    def __getitem__(self, var):
+        val = self.values[var]
+        if val is None:
+            raise KeyError(var)
+        return val
+
+    def get(self, var, default=None):
+        val = self.values[var]
+        return default if val is None else val
+
+    def __setitem__(self, var, val):
+        old = self.values[var]
+        if old == val:
+            return
+        if old is None:
+            self.nassigned += 1
+        else:
+            self._count(var, old, -1)
+        self.values[var] = val
+        self._count(var, val, 1)
+
+    def __delitem__(self, var):
+        old = self.values[var]
+        if old is None:
+            raise KeyError(var)
+        self.values[var] = None
+        self.nassigned -= 1
+        self._count(var, old, -1)
+
+    def _count(self, var, val, change):
+        i = self.value_index[val]
+        for u in self.var_units[var]:
+            self.used[u * self.nvalues + i] += change
+
+    def conflicts(self, var, val):
+        """True if some other variable sharing a unit with var has val."""
+        i = self.value_index[val]
+        used = self.used
+        nvalues = self.nvalues
+        own = self.values[var] == val   # var itself is counted if it has val
+        for u in self.var_units[var]:
+            if used[u * nvalues + i] > own:
+                return True
+        return False
+
+    def keys(self):
+        return [var for var, val in enumerate(self.values) if val is not None]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return [(var, val) for var, val in enumerate(self.values) if val is not None]
+
+    def __repr__(self):
+        return 'ArrayAssignment({})'.format(dict(self.items()))
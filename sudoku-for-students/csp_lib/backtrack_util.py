@@ -3,7 +3,8 @@
 
 import random
 from .util import (first, count)
-from constraint_prop import AC3
+from .constraint_prop import AC3, unit_propagate
+from .memo import memo_propagate
 
 identity = lambda x: x
 
@@ -49,6 +50,11 @@ def unordered_domain_values(var, assignment, csp):
     return csp.choices(var)
 
 
+def shuffled_domain_values(var, assignment, csp):
+    """Random value order.  Seed the random module for repeatable runs."""
+    return shuffled(csp.choices(var))
+
+
 def lcv(var, assignment, csp):
     """Least-constraining-values heuristic."""
     return sorted(csp.choices(var),
@@ -81,8 +87,20 @@ def forward_checking(csp, var, value, assignment, removals):
 
 
 def mac(csp, var, value, assignment, removals):
-    """Maintain arc consistency."""
+    """Maintain arc consistency.  Looks the result up in csp.memo if
+    there is one (see memo.memoize)."""
     
     # Uses AC3 algorithm with a list of each neighbor of var    
-    return AC3(csp, [(X, var) for X in csp.neighbors[var]], removals)
-
+    # and the n-ary constraints on var
+    queue = [(X, var) for X in csp.neighbors[var]] + csp.propagators.get(var, [])
+    if csp.memo is not None:
+        return memo_propagate(csp, AC3, var, queue, removals)
+    return AC3(csp, queue, removals)
+
+
+def mac_unit_rules(csp, var, value, assignment, removals):
+    """Maintain arc consistency and the unit rules (hidden singles)."""
+    queue = [(X, var) for X in csp.neighbors[var]] + csp.propagators.get(var, [])
+    if csp.memo is not None:
+        return memo_propagate(csp, unit_propagate, var, queue, removals)
+    return unit_propagate(csp, queue, removals)
@@ -0,0 +1,141 @@
+# ______________________________________________________________________________
+# Command line solver (installed as sudoku-solve)
+
+import argparse
+import sys
+from functools import partial
+
+from .sudoku import Sudoku
+from .memo import memoize
+from .pipeline import adaptive_solve, learn_thresholds
+from .results import ResultWriter, invalid_record, read_results, result_record
+from .util import tic, tock
+
+
+def solve(puzzle, method='serial', thresholds=None, memo=False):
+    """Solve an 81 character puzzle string.  Returns (sudoku, assignment),
+    where assignment is "Failure" if there is no solution.
+
+    method - 'serial' for pipeline.adaptive_solve as in driver.py, or
+        'portfolio' / 'split' for the multi-process solvers
+    thresholds - for adaptive_solve
+    memo - if true, remember propagation results (see memo.memoize)
+    """
+    s, assignment, _level, _stages = solve_stages(puzzle, method, thresholds, memo)
+    return s, assignment
+
+
+def solve_stages(puzzle, method='serial', thresholds=None, memo=False):
+    """As solve, but returns (sudoku, assignment, level, stages) with
+    level and stages as from adaptive_solve.  The multi-process methods
+    give level 'ac3' or 'search' and no stages."""
+    s = Sudoku(puzzle)
+    if memo:
+        memoize(s)
+    if method == 'serial':
+        return (s,) + adaptive_solve(s, thresholds)
+    if method == 'portfolio':
+        # Only pay for multiprocessing when it is asked for
+        from .portfolio import portfolio_search
+        _config, assignment, s.nassigns, _seconds = portfolio_search(s)
+    else:
+        from .split import split_search
+        assignment = split_search(s)
+    level = None if assignment == "Failure" else 'search' if s.nassigns else 'ac3'
+    return s, assignment, level, None
+
+
+def solve_record(puzzle, method='serial', thresholds=None, memo=False):
+    """Solve puzzle as solve() does and return its results.result_record,
+    with the memo statistics if memo is true.  A puzzle that is not a
+    Sudoku grid gets a results.invalid_record instead, so one bad line
+    does not stop a stream of them."""
+    start = tic()
+    try:
+        s, assignment, level, stages = solve_stages(puzzle, method, thresholds, memo)
+    except ValueError as e:
+        return invalid_record(puzzle, str(e.args[0]))
+    seconds = tock(start)
+    solution = None if assignment == "Failure" else s.to_string(assignment)
+    return result_record(puzzle, solution, seconds, s.nassigns, level, stages,
+                         s.memo.stats() if memo else None)
+
+
+def solve_records(puzzles, method='serial', processes=None, thresholds=None, memo=False):
+    """Yield solve_record for each puzzle.  With processes, the puzzles
+    are shared out over a pool of that many processes ('serial' method
+    only) and the records come in the order they finish."""
+    job = partial(solve_record, method=method, thresholds=thresholds, memo=memo)
+    if not processes:
+        for puzzle in puzzles:
+            yield job(puzzle)
+        return
+    from multiprocessing import Pool
+    with Pool(processes) as pool:
+        yield from pool.imap_unordered(job, puzzles, chunksize=16)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='sudoku-solve',
+        description="Solve Sudoku puzzles given as 81 character strings "
+                    "('.' or '0' for an empty cell), one per line.")
+    parser.add_argument('puzzles', nargs='*',
+                        help="puzzles to solve (default: read them from stdin)")
+    parser.add_argument('--method', choices=('serial', 'portfolio', 'split'),
+                        default='serial')
+    parser.add_argument('--display', action='store_true',
+                        help="print solutions as boxes instead of strings")
+    parser.add_argument('--jsonl', action='store_true',
+                        help="print one JSON record per puzzle: puzzle, solution, "
+                             "status, seconds, nodes, level and stages")
+    parser.add_argument('--processes', type=int,
+                        help="solve this many puzzles at a time (with --jsonl "
+                             "and the serial method)")
+    parser.add_argument('--thresholds', metavar='RESULTS',
+                        help="learn the serial method's stage thresholds from a "
+                             "--jsonl output file, or 'none' to run every stage")
+    parser.add_argument('--memo', action='store_true',
+                        help="remember propagation results in a transposition table "
+                             "(its statistics go in the --jsonl records)")
+    args = parser.parse_args(argv)
+    if args.processes and not (args.jsonl and args.method == 'serial'):
+        parser.error("--processes needs --jsonl and --method serial")
+    thresholds = None
+    if args.thresholds == 'none':
+        thresholds = {}
+    elif args.thresholds:
+        thresholds = learn_thresholds(read_results(args.thresholds))
+
+    puzzles = (puzzle for puzzle in args.puzzles or (line.strip() for line in sys.stdin)
+               if puzzle)
+    status = 0
+    if args.jsonl:
+        with ResultWriter(sys.stdout) as out:
+            for record in solve_records(puzzles, args.method, args.processes,
+                                        thresholds, args.memo):
+                out.write(record)
+                if record['solution'] is None:
+                    status = 1
+        return status
+
+    for puzzle in puzzles:
+        try:
+            s, assignment = solve(puzzle, args.method, thresholds, args.memo)
+        except ValueError as e:
+            print(e.args[0], puzzle, file=sys.stderr)
+            status = 1
+            continue
+        if assignment == "Failure":
+            print("Unable to solve puzzle", puzzle, file=sys.stderr)
+            status = 1
+        elif args.display:
+            s.display(assignment)
+            print()
+        else:
+            print(s.to_string(assignment))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+'''
+Constraint propagation
+'''
+
+from heapq import heappush, heappop
+from itertools import count
+
+from .csp import VALUE_REMOVED, WIPEOUT
+
+def AC3(csp, queue=None, removals=None):
+    """AC3 constraint propagation
+
+    csp - constraint satisfaction problem
+    queue - list of constraints (might be None in which case they are
+        populated from csp's variable list (len m) and neighbors (len k1...km):
+        [(v1, n1), (v1, n2), ..., (v1, nk1), (v2, n1), (v2, n3), ... (v2, nk2),
+         (vm, n1), (vk, n2), ..., (vk, nkm) ]
+        followed by csp's n-ary propagators.  Besides (Xi, Xj) arcs the
+        queue may hold propagators, objects with a method
+        propagate(csp, removals) that prunes for one n-ary constraint and
+        returns the list of variables it changed, or None on a wipe out.
+        A propagator may also have the attributes events, the domain events
+        (see csp.py) it wants to be woken up for, default VALUE_REMOVED,
+        and priority, where lower runs earlier, default 1.
+        Arcs (x, Xi) are requeued on the events in csp.arc_events.
+    removals - List of variables and values that have been pruned.  This is only
+        useful for backtracking search which will enable us to restore things
+        to a former point
+
+    returns
+        True - All constraints have been propagated and hold
+        False - A variables domain has been reduced to the empty set through
+            constraint propagation.  The problem cannot be solved from the
+            current configuration of the csp.
+    """
+    csp.support_pruning()   # Ensure curr_domains initialized
+    #Queue creation
+    if queue is None:
+        queue = []
+        for i in csp.variables:
+            neighborsOfI = csp.neighbors[i]
+            for j in neighborsOfI:
+                newTuple = (i,j)
+                queue.append(newTuple)
+        queue.extend(all_propagators(csp))
+
+    # Arcs are cheap and go on a plain stack.  n-ary propagators wait on
+    # an agenda ordered by their priority and only run once no arcs are
+    # left; each is on the agenda at most once.
+    agenda = []
+    pending = set()
+    order = count()
+    arcs = []
+    for item in queue:
+        if isinstance(item, tuple):
+            arcs.append(item)
+        else:
+            schedule(agenda, pending, order, item)
+    queue = arcs
+
+    # prune reports what happened to each variable in csp.events
+    csp.events = {}
+    try:
+        #While the queue isn't empty
+        while queue or agenda:
+            if queue:
+                # (Xi,Xj) = queue.dequeue() #get binary constraints
+                Xi, Xj = queue.pop()
+                #if revise(CSP, xi,xj):
+                if not revise(csp, Xi, Xj, removals):
+                    continue
+                current = None
+            else:
+                # n-ary constraint, cheapest first
+                current = heappop(agenda)[2]
+                pending.discard(current)
+                Xj = None
+                if current.propagate(csp, removals) is None:
+                    return False
+            # Requeue what subscribed to the events of the changed variables
+            for Xi, event in csp.events.items():
+                if event & WIPEOUT:
+                    # if domain(xi) is empty return false
+                    return False
+                if event & csp.arc_events:
+                    #   for each (xk) in {neighbors(xi)-xj}
+                    #   queue.enqueue(xk,xi)
+                    for x in csp.neighbors[Xi]:
+                        if x != Xj:
+                            queue.append((x, Xi))
+                for p in csp.propagators.get(Xi, ()):
+                    if p is not current and event & getattr(p, 'events', VALUE_REMOVED):
+                        schedule(agenda, pending, order, p)
+            csp.events.clear()
+    finally:
+        csp.events = None
+    return True
+
+
+def schedule(agenda, pending, order, propagator):
+    """Put propagator on AC3's agenda unless it is already there."""
+    if propagator not in pending:
+        pending.add(propagator)
+        heappush(agenda, (getattr(propagator, 'priority', 1), next(order), propagator))
+
+
+def all_propagators(csp):
+    """Return each of csp's n-ary propagators once, in a fixed order."""
+    return list(dict.fromkeys(p for props in csp.propagators.values() for p in props))
+
+
+def revise(csp, Xi, Xj, removals):
+    """Return true if we remove a value.
+    Given a pair of variables Xi, Xj, check for each value i in Xi's domain
+    if there is some value j in Xj's domain that does not violate the
+    constraints.
+
+    csp - constraint satisfaction problem
+    Xi, Xj - Variable pair to check
+    removals - list of removed (variable, value) pairs.  When value i is
+        pruned from Xi, the constraint satisfaction problem needs to know
+        about it and possibly updated the removed list (if we are maintaining
+        one)
+
+    If csp.supports has bitmasks for the arc, the check for each x is a
+    single AND with the bitmask of Xj's domain instead of calls to
+    csp.constraints.
+    """
+    if removals == None:
+        removals = []
+    #revised = false
+    revised = False
+    if csp.supports is not None and (Xi, Xj) in csp.supports:
+        supports = csp.supports[(Xi, Xj)]
+        mask = csp.domain_mask(Xj)
+        for x in csp.curr_domains[Xi][:]:
+            if not supports[x] & mask:
+                csp.prune(Xi, x, removals)
+                revised = True
+        return revised
+    #for each x in domain xi (a copy, as pruning changes the domain)
+    for x in csp.curr_domains[Xi][:]:
+        constraintSatisifed = False
+        #if there isn't a y that exists such that it is contained in the domain xj such that constraint holds between x and y
+        for y in csp.curr_domains[Xj]:
+            if csp.constraints(Xi,x,Xj,y):
+                constraintSatisifed = True
+                break
+            #delete x from domain xi
+        if not constraintSatisifed:
+            csp.prune(Xi,x,removals)
+            # revised = true
+            revised = True
+    #return revised
+    return revised
+
+def hidden_singles(csp, removals=None):
+    """Unit rule: if a value fits in only one variable of a unit, that
+    variable must take the value.
+
+    csp - constraint satisfaction problem with a units attribute, a list of
+        groups of variables that must all take different values and that
+        together cover every value of their domains (e.g. Sudoku rows,
+        columns and boxes)
+    removals - list of removed (variable, value) pairs, see revise
+
+    returns
+        None - A unit has a value with no place left; the problem cannot
+            be solved from the current configuration of the csp.
+        Otherwise the list of variables that were reduced to a single value
+    """
+    if removals is None:
+        removals = []
+    # Sudoku keeps candidate counts per unit and need not scan
+    singles = csp.unit_singles() if hasattr(csp, 'unit_singles') else unit_singles(csp)
+    if singles is None:
+        return None
+    assigned = []
+    for var, val in singles:
+        domain = csp.curr_domains[var]
+        if len(domain) > 1 and val in domain:
+            for other in domain[:]:
+                if other != val:
+                    csp.prune(var, other, removals)
+            assigned.append(var)
+    return assigned
+
+
+def unit_singles(csp):
+    """Scan csp.units for hidden singles.  Returns a list of (variable,
+    value) pairs where value has one place left in a unit and variable is
+    still undecided, or None if a value has no place left in a unit."""
+    singles = []
+    for unit in csp.units:
+        places = {}
+        for var in unit:
+            for val in csp.curr_domains[var]:
+                places.setdefault(val, []).append(var)
+        if len(places) < len(unit):
+            return None     # Some value cannot go anywhere in this unit
+        for val, cells in places.items():
+            if len(cells) == 1 and len(csp.curr_domains[cells[0]]) > 1:
+                singles.append((cells[0], val))
+    return singles
+
+
+def unit_propagate(csp, queue=None, removals=None):
+    """Alternate AC3 and hidden_singles until neither makes progress.
+    queue and removals are as for AC3.
+
+    Returns True/False as AC3 does.
+    """
+    while AC3(csp, queue, removals):
+        assigned = hidden_singles(csp, removals)
+        if assigned is None:
+            return False
+        if not assigned:
+            return True
+        # Only the arcs pointing at newly fixed variables need rechecking
+        queue = [(X, var) for var in assigned for X in csp.neighbors[var]]
+        queue.extend(p for var in assigned for p in csp.propagators.get(var, ()))
+    return False
+
+
+def naked_singles(csp, removals=None, variables=None):
+    """Remove the value of every variable that is down to a single value
+    from its neighbors' domains, and again for the variables that this
+    leaves with a single value.  If variables is given, start from those
+    only: the others are known to have been done already.
+
+    For constraints saying that neighbors take different values (as in
+    Sudoku) this reaches the same state as AC3, but without checking
+    constraints or queueing arcs.  For other constraints it is not sound.
+    removals is as for AC3.
+
+    Returns False if a domain was wiped out, otherwise True.
+    """
+    csp.support_pruning()
+    domains = csp.curr_domains
+    if variables is None:
+        variables = csp.variables
+    stack = [var for var in variables if len(domains[var]) == 1]
+    while stack:
+        var = stack.pop()
+        val = domains[var][0]
+        for x in csp.neighbors[var]:
+            domain = domains[x]
+            if val in domain:
+                csp.prune(x, val, removals)
+                if not domain:
+                    return False
+                if len(domain) == 1:
+                    stack.append(x)
+    return True
+
+
+def unit_rules(csp, removals=None):
+    """Alternate naked_singles and hidden_singles until neither makes
+    progress.  Under the same conditions as naked_singles this is
+    unit_propagate without AC3's arc checks.
+
+    Returns True/False as AC3 does.
+    """
+    assigned = None
+    while naked_singles(csp, removals, assigned):
+        # Only the variables hidden_singles fixed are new singles
+        assigned = hidden_singles(csp, removals)
+        if assigned is None:
+            return False
+        if not assigned:
+            return True
+    return False
@@ -1,8 +1,17 @@
+from array import array
 
 from .util import (count, first)
 
 from .problem import Problem
 
+# Domain events reported by CSP.prune.  They are bit flags; one prune can
+# raise several, e.g. removing 1 from [1, 2] is VALUE_REMOVED | BOUNDS |
+# SINGLETON.
+VALUE_REMOVED = 1   # Any value removed
+BOUNDS = 2          # Smallest or largest value (in value_rank order) removed
+SINGLETON = 4       # Domain now has exactly one value
+WIPEOUT = 8         # Domain now empty
+
 class CSP(Problem):
     """This class describes finite-domain Constraint Satisfaction Problems.
     A CSP is specified by the following inputs:
@@ -12,6 +21,11 @@ class CSP(Problem):
                     the other variables that participate in constraints.
         constraints A function f(A, a, B, b) that returns true if neighbors
                     A, B satisfy the constraint when they have values A=a, B=b
+                    or a dict {(A, B): [(a, b), ...]} listing the allowed
+                    pairs of values for each constrained pair of neighbors
+                    (a table for (B, A) is derived if not given)
+        propagators Optional dict of {var:[propagator, ...]} for constraints
+                    on more than two variables.  See constraint_prop.AC3.
 
     In the textbook and in most mathematical definitions, the
     constraints are specified as explicit pairs of allowable values,
@@ -19,7 +33,9 @@ class CSP(Problem):
     most cases. (For example, the n-Queens problem can be represented
     in O(n) space using this notation, instead of O(N^4) for the
     explicit representation.) In terms of describing the CSP as a
-    problem, that's all there is.
+    problem, that's all there is.  Tables are accepted too, for problems
+    such as KenKen where the allowed pairs are naturally listed; with a
+    table, self.constraints is a function that looks pairs up in it.
 
     However, the class also supports data structures and methods that help you
     solve CSPs by calling a search function on the CSP. Methods and slots are
@@ -31,6 +47,24 @@ class CSP(Problem):
                                 conflict with var=val
         curr_domains[var]       Slot: remaining consistent values for var
                                 Used by constraint propagation routines.
+        events                  Slot: {var: event flags} collected by prune
+                                while AC3 runs, otherwise None.
+        arc_events              Events of Xi on which AC3 rechecks arcs
+                                (x, Xi).  Constraints where only a
+                                neighbor's assignment matters (like
+                                different values) can set SINGLETON.
+        supports[(A, B)][a]     Slot: bitmask (see value_bits) of the values
+                                of B that allow A=a, or None if constraints
+                                are only available as a function.
+                                Used by revise.
+        zobrist[var][val]       Slot: random 64 bit key of each value, or
+                                None (the default) to not hash states.
+                                Set by memo.memoize.
+        state_hash              Slot: xor of the keys of the values pruned
+                                so far, kept up to date by prune, suppose,
+                                restore and restore_snapshot.
+        memo                    Slot: memo.TranspositionTable of propagation
+                                results used by mac, or None.
     The following methods are used only by graph_search and tree_search:
         actions(state)          Return a list of actions
         result(state, action)   Return a successor of state
@@ -48,27 +82,72 @@ class CSP(Problem):
     suppose(var, value) - Suppose that variable var = value.  Returns a list
         of values removed [(var, val1), (var, val2), ...]
     prune(var, value, removed_list) - Rule out value for specified variable
-        If removed_list is not None, (var, value) is appended to the list
+        If removed_list is not None, (var, value) is appended to the list.
+        While a propagation scheduler (AC3) is running, the domain events
+        caused are or-ed into events[var]
     choices(var) - List values remaining in domain
     infer_assignment() - Assign variables whose domain has been reduced
         to a single value
     restore(removals) - Given a list of pruned values [(var, val), ...],
-        restore these values to their variable's domain
+        restore these values to their variable's domain.  Domains are
+        kept in value_rank() (sorted) order whatever was pruned and
+        restored, so searches are repeatable
     conflicted_vars(current) - Given a current set of assignments, return
         the set of variables that are in conflict.
+    snapshot() - Return curr_domains packed into bytes, one bitmask per
+        variable, e.g. to send a search state to another process.  Needs
+        at most 64 distinct values
+    restore_snapshot(snap) - Set curr_domains back to a snapshot.  Values
+        come back in sorted order.
     """
 
-    def __init__(self, variables, domains, neighbors, constraints):
+    arc_events = VALUE_REMOVED
+
+    def __init__(self, variables, domains, neighbors, constraints, propagators=None):
         """Construct a CSP problem. If variables is empty, it becomes domains.keys()."""
         variables = variables or list(domains.keys())
 
         self.variables = variables
         self.domains = domains
         self.neighbors = neighbors
-        self.constraints = constraints
+        self.propagators = propagators or {}
         self.initial = ()
         self.curr_domains = None
+        self.events = None
         self.nassigns = 0
+        self.supports = None
+        self.zobrist = None
+        self.state_hash = 0
+        self.memo = None
+        if callable(constraints):
+            self.constraints = constraints
+        else:
+            self.tables = {}
+            for (A, B), pairs in constraints.items():
+                self.tables[(A, B)] = set(pairs)
+                if (B, A) not in constraints:
+                    self.tables[(B, A)] = {(b, a) for a, b in pairs}
+            self.constraints = self.table_constraint
+            self.supports = self.table_supports()
+
+    def table_constraint(self, A, a, B, b):
+        """Constraint function for a CSP built from tables.  Pairs of
+        variables without a table are unconstrained."""
+        table = self.tables.get((A, B))
+        return table is None or (a, b) in table
+
+    def table_supports(self):
+        """Precompute supports from the tables: for each arc (A, B) and value
+        a of A, the bitmask of values b of B with (a, b) allowed.  Pairs
+        with a value that is in no domain can never hold and are skipped."""
+        bits = self.value_bits()
+        supports = {}
+        for (A, B), table in self.tables.items():
+            arc = supports[(A, B)] = dict.fromkeys(self.domains[A], 0)
+            for a, b in table:
+                if a in arc and b in bits:
+                    arc[a] |= bits[b]
+        return supports
 
     def assign(self, var, val, assignment):
         """Add {var: val} to assignment; Discard the old value if any."""
@@ -132,8 +211,9 @@ class CSP(Problem):
         # Has no effect after first call
         if self.curr_domains is None:
             self.curr_domains = dict()  # first call to support_pruning
+            rank = self.value_rank()
             for v in self.variables:
-                self.curr_domains[v] = list(self.domains[v])
+                self.curr_domains[v] = sorted(self.domains[v], key=rank.__getitem__)
 
     def suppose(self, var, value):
         """suppose - Make an assumption that var = value, modifies the
@@ -154,6 +234,10 @@ class CSP(Problem):
         removals = [(var, a) for a in self.curr_domains[var] if a != value]
         # Restrict domain the specified value
         self.curr_domains[var] = [value]
+        if self.zobrist is not None:
+            keys = self.zobrist[var]
+            for _var, a in removals:
+                self.state_hash ^= keys[a]
         return removals
 
     def prune(self, var, value, removals=None):
@@ -163,9 +247,26 @@ class CSP(Problem):
         appending the pruned variable and value as a tuple (var, value)
         to the list.  This is useful for backtracking
         """
-        self.curr_domains[var].remove(value)
+        domain = self.curr_domains[var]
+        domain.remove(value)
         if removals is not None:
             removals.append((var, value))
+        if self.zobrist is not None:
+            self.state_hash ^= self.zobrist[var][value]
+        if self.events is not None:
+            if not domain:
+                event = VALUE_REMOVED | BOUNDS | WIPEOUT
+            elif len(domain) == 1:
+                event = VALUE_REMOVED | BOUNDS | SINGLETON
+            else:
+                # Domains are kept in value_rank order, so the ends are the bounds
+                rank = self._value_rank
+                r = rank[value]
+                if r < rank[domain[0]] or r > rank[domain[-1]]:
+                    event = VALUE_REMOVED | BOUNDS
+                else:
+                    event = VALUE_REMOVED
+            self.events[var] = self.events.get(var, 0) | event
 
     def choices(self, var):
         """Return all values for var that aren't currently ruled out."""
@@ -187,9 +288,104 @@ class CSP(Problem):
                 for v in self.variables if 1 == len(self.curr_domains[v])}
 
     def restore(self, removals):
-        """Undo a supposition and all inferences from it."""
+        """Undo a supposition and all inferences from it.  Each value goes
+        back to its place in value_rank order, so the order of a domain
+        never depends on the history of the search."""
+        rank = self._value_rank
+        curr_domains = self.curr_domains
         for B, b in removals:
-            self.curr_domains[B].append(b)
+            domain = curr_domains[B]
+            # Domains are short and values mostly come back at the end
+            r = rank[b]
+            i = len(domain)
+            while i and rank[domain[i - 1]] > r:
+                i -= 1
+            domain.insert(i, b)
+        if self.zobrist is not None:
+            zobrist = self.zobrist
+            for B, b in removals:
+                self.state_hash ^= zobrist[B][b]
+
+    def rehash(self):
+        """Recompute state_hash from curr_domains."""
+        state_hash = 0
+        for var, keys in self.zobrist.items():
+            domain = self.curr_domains[var]
+            for val, key in keys.items():
+                if val not in domain:
+                    state_hash ^= key
+        self.state_hash = state_hash
+
+    # These are for saving and restoring the whole pruning state
+
+    def value_rank(self):
+        """Return {value: i} numbering every value of every domain in
+        sorted order (or first seen order if the values cannot be
+        compared).  curr_domains are kept in this order.  Computed once;
+        domains must not change afterwards."""
+        if getattr(self, '_value_rank', None) is None:
+            values = list(dict.fromkeys(val for var in self.variables
+                                        for val in self.domains[var]))
+            try:
+                values = sorted(values)
+            except TypeError:
+                pass    # Mixed types, no natural order
+            self._value_rank = {val: i for i, val in enumerate(values)}
+        return self._value_rank
+
+    def value_bits(self):
+        """Return {value: bit} numbering every value of every domain, in
+        value_rank order.  Bitmasks are Python ints, so there can be any
+        number of values.  Computed once; domains must not change
+        afterwards."""
+        if getattr(self, '_value_bits', None) is None:
+            self._value_bits = {val: 1 << i for val, i in self.value_rank().items()}
+            self._masks = {}    # bitmask -> tuple of values, filled as needed
+        return self._value_bits
+
+    def snapshot_code(self):
+        """Return the typecode of the smallest array item with a bit per
+        value, for snapshots.  Raises ValueError above 64 values."""
+        nvalues = len(self.value_bits())
+        for code in 'BHLQ':
+            if array(code).itemsize * 8 >= nvalues:
+                return code
+        raise ValueError("Too many distinct values for a snapshot", nvalues)
+
+    def domain_mask(self, var):
+        """Return the bitmask of values remaining for var."""
+        bits = self.value_bits()
+        mask = 0
+        for val in self.choices(var):
+            mask |= bits[val]
+        return mask
+
+    def mask_values(self, mask):
+        """Return the values in a bitmask, as a sorted tuple."""
+        values = self._masks.get(mask)
+        if values is None:
+            values = tuple(val for val, bit in self.value_bits().items() if mask & bit)
+            self._masks[mask] = values
+        return values
+
+    def snapshot(self):
+        """Return the current domains as bytes, one bitmask per variable
+        in the order of self.variables."""
+        self.support_pruning()
+        return array(self.snapshot_code(),
+                     [self.domain_mask(v) for v in self.variables]).tobytes()
+
+    def restore_snapshot(self, snap):
+        """Make curr_domains match snap, a value returned by snapshot()."""
+        self.support_pruning()
+        masks = array(self.snapshot_code())
+        masks.frombytes(snap)
+        mask_values = self.mask_values
+        curr_domains = self.curr_domains
+        for var, mask in zip(self.variables, masks):
+            curr_domains[var] = list(mask_values(mask))
+        if self.zobrist is not None:
+            self.rehash()
 
     # This is for min_conflicts search
 
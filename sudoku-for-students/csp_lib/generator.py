@@ -0,0 +1,184 @@
+# ______________________________________________________________________________
+# Sudoku puzzle generation
+
+import random
+from multiprocessing import Pool
+
+from .sudoku import Sudoku, flatten
+from .backtrack_util import (mrv, mac, mac_unit_rules, shuffled_domain_values,
+                             unordered_domain_values)
+from .constraint_prop import AC3, naked_singles, unit_propagate, unit_rules
+from .backtrack import backtracking_search, count_solutions
+
+# Difficulty levels, easiest first: the weakest propagation that solves
+# the puzzle without any search.
+LEVELS = ('ac3', 'unit', 'search')
+
+EMPTY = '.' * 81
+
+
+def solved(csp):
+    """True if every variable of csp is down to a single value."""
+    return all(len(csp.curr_domains[v]) == 1 for v in csp.variables)
+
+
+def random_solution():
+    """Return a random completed grid as an 81 character string.
+    Uses the module level random generator; seed it for repeatable output."""
+    s = Sudoku(EMPTY)
+    assignment = backtracking_search(s, mrv, shuffled_domain_values, mac)
+    return s.to_string(assignment)
+
+
+def is_unique(puzzle):
+    """True if puzzle has exactly one solution."""
+    s = Sudoku(puzzle)
+    if not unit_propagate(s):
+        return False
+    return count_solutions(s, mrv, unordered_domain_values, mac, limit=2) == 1
+
+
+def grade(puzzle):
+    """Return the entry of LEVELS for the weakest propagation that solves
+    puzzle.  Assumes puzzle has a unique solution."""
+    s = Sudoku(puzzle)
+    if AC3(s) and solved(s):
+        return 'ac3'
+    # Unit rules pick up from where AC3 stopped
+    if unit_propagate(s) and solved(s):
+        return 'unit'
+    return 'search'
+
+
+def dig(solution, difficulty=None):
+    """Remove givens from a completed grid, in random order, for as long as
+    the puzzle stays uniquely solvable and no harder than difficulty
+    (one of LEVELS, None for no limit).  Returns the puzzle string.
+
+    One Sudoku holds the puzzle while it is dug, each given with its value
+    removed from the neighbors (see give).  Removing a given restores just
+    that, and every test propagates from there and is restored again, so
+    nothing is rebuilt or propagated from scratch between removals.
+    """
+    limit = LEVELS.index(difficulty) if difficulty else len(LEVELS) - 1
+    s = Sudoku(EMPTY)
+    cells = flatten(s.rows)
+    position = {var: p for p, var in enumerate(cells)}
+    givens = {}     # position -> removals of that given (see give)
+    for p in range(81):
+        givens[p] = give(s, cells[p], solution[p])
+    order = list(range(81))
+    random.shuffle(order)
+    for p in order:
+        removals = givens.pop(p)
+        s.restore(removals)
+        # Values also ruled out by another given are removed again, now
+        # on that given's account
+        for var, val in removals:
+            for x in s.neighbors[var]:
+                q = position[x]
+                if q in givens and solution[q] == val:
+                    s.prune(var, val, givens[q])
+                    break
+        if limit < len(LEVELS) - 1:
+            # Propagation that solves the puzzle also proves it unique
+            keep = not solved_by(s, limit)
+        else:
+            keep = has_other_solution(s, cells[p], solution[p])
+        if keep:
+            givens[p] = give(s, cells[p], solution[p])
+    return ''.join(solution[p] if p in givens else '.' for p in range(81))
+
+
+def give(csp, var, value):
+    """Suppose var = value in the Sudoku csp and remove value from the
+    domains of var's neighbors.  Returns the removals, for csp.restore."""
+    removals = csp.suppose(var, value)
+    for x in csp.neighbors[var]:
+        if value in csp.curr_domains[x]:
+            csp.prune(x, value, removals)
+    return removals
+
+
+def solved_by(csp, level):
+    """True if propagation up to LEVELS[level] ('ac3' or 'unit') leaves
+    every variable of the Sudoku csp with one value.  naked_singles and
+    unit_rules reach the same state as AC3 and unit_propagate there, with
+    less work.  csp is restored afterwards."""
+    removals = []
+    done = naked_singles(csp, removals) and (
+        solved(csp) or level > 0 and unit_rules(csp, removals) and solved(csp))
+    csp.restore(removals)
+    return done
+
+
+def has_other_solution(csp, var, value):
+    """True if the Sudoku csp has a solution with var not equal to value.
+    csp is restored afterwards."""
+    removals = []
+    csp.prune(var, value, removals)
+    found = unit_rules(csp, removals) and count_solutions(
+        csp, mrv, unordered_domain_values, mac_unit_rules, limit=1) > 0
+    csp.restore(removals)
+    return found
+
+
+def generate(difficulty=None, seed=None, max_tries=20):
+    """Return a (puzzle, level) pair for a new uniquely solvable puzzle.
+
+    difficulty - one of LEVELS; the puzzle is graded exactly at that level
+        (None accepts whatever the digging produces)
+    seed - seed for the random generator, for repeatable puzzles
+    max_tries - number of fresh grids to dig before giving up
+    """
+    if seed is not None:
+        random.seed(seed)
+    for _ in range(max_tries):
+        puzzle = dig(random_solution(), difficulty)
+        level = grade(puzzle)
+        if difficulty is None or level == difficulty:
+            return puzzle, level
+    raise RuntimeError("No {} puzzle after {} tries".format(difficulty, max_tries))
+
+
+def _generate_job(args):
+    """Pool worker: unpack arguments for generate."""
+    difficulty, seed = args
+    return generate(difficulty, seed)
+
+
+def generate_many(count, difficulty=None, processes=None, seed=None):
+    """Generate count puzzles on a pool of processes (default: one per core).
+    Yields (puzzle, level) pairs in completion order.  Each puzzle gets its
+    own seed derived from seed, so a seeded run is repeatable up to order."""
+    seeds = random.Random(seed).sample(range(2 ** 32), count)
+    with Pool(processes) as pool:
+        for result in pool.imap_unordered(_generate_job,
+                                          [(difficulty, s) for s in seeds]):
+            yield result
+
+
+def write_puzzles(path, puzzles):
+    """Write puzzle strings to path, one 81 character grid per line."""
+    with open(path, 'w') as f:
+        for puzzle in puzzles:
+            f.write(puzzle + '\n')
+
+
+if __name__ == '__main__':
+    import argparse
+    from .util import tic, tock
+
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles")
+    parser.add_argument('count', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--difficulty', choices=LEVELS)
+    parser.add_argument('--processes', type=int)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    start = tic()
+    write_puzzles(args.output,
+                  (puzzle for puzzle, _level in
+                   generate_many(args.count, args.difficulty, args.processes, args.seed)))
+    print("{} puzzles in {:.1f} seconds".format(args.count, tock(start)))
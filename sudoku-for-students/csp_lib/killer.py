@@ -0,0 +1,209 @@
+# ______________________________________________________________________________
+# Killer Sudoku and KenKen style cages: n-ary arithmetic constraints
+
+import random
+from math import prod
+
+from .assignment import ArrayAssignment
+from .csp import BOUNDS, VALUE_REMOVED
+from .sudoku import DIGIT_INDEX, Sudoku, flatten
+
+
+class Cage:
+    """A constraint that the values of cells combine to total.
+
+    Cages are n-ary propagators (see constraint_prop.AC3): propagate()
+    enforces bounds consistency, i.e. removes every value that cannot
+    reach total whatever the other cells take within their current
+    smallest and largest values.  Values are digit strings as in Sudoku.
+    Subclasses define combine(numbers) and fits(v, rest_lo, rest_hi).
+    Only changes to the cells' bounds can make it prune more.
+    """
+
+    events = BOUNDS
+    priority = 1
+
+    def __init__(self, total, cells):
+        self.total = total
+        self.cells = list(cells)
+
+    def __repr__(self):
+        return '{}({}, {})'.format(type(self).__name__, self.total, self.cells)
+
+    def satisfied(self, assignment):
+        """True if every cell is assigned and the values reach total."""
+        return (all(c in assignment for c in self.cells) and
+                self.combine(int(assignment[c]) for c in self.cells) == self.total)
+
+    def propagate(self, csp, removals=None):
+        """Prune to bounds consistency.  Returns the list of cells whose
+        domains changed, or None if a domain was wiped out."""
+        domains = csp.curr_domains
+        changed = []
+        revised = True
+        while revised:
+            revised = False
+            if not all(domains[c] for c in self.cells):
+                return None
+            mins = [min(int(v) for v in domains[c]) for c in self.cells]
+            maxs = [max(int(v) for v in domains[c]) for c in self.cells]
+            if not self.combine(mins) <= self.total <= self.combine(maxs):
+                return None
+            for i, c in enumerate(self.cells):
+                rest_lo = self.combine(mins[:i] + mins[i + 1:])
+                rest_hi = self.combine(maxs[:i] + maxs[i + 1:])
+                for v in domains[c][:]:
+                    if not self.fits(int(v), rest_lo, rest_hi):
+                        csp.prune(c, v, removals)
+                        revised = True
+                        if c not in changed:
+                            changed.append(c)
+                if not domains[c]:
+                    return None
+        return changed
+
+
+class SumCage(Cage):
+    """Cells add up to total (Killer Sudoku, KenKen '+').
+
+    With distinct=True the cells must also take different values (as in
+    Killer Sudoku).  A value is then only kept if it is part of some
+    combination of different values from the cells' domains that adds up
+    to total, which is stronger than bounds consistency.  Cages are small,
+    so listing the combinations is cheap.
+    """
+
+    combine = staticmethod(sum)
+
+    def __init__(self, total, cells, distinct=False):
+        Cage.__init__(self, total, cells)
+        self.distinct = distinct
+        if distinct:
+            # Any removal can break a combination, and listing them costs more
+            self.events = VALUE_REMOVED
+            self.priority = 2
+
+    def fits(self, v, rest_lo, rest_hi):
+        return rest_lo <= self.total - v <= rest_hi
+
+    def propagate(self, csp, removals=None):
+        if not self.distinct:
+            return Cage.propagate(self, csp, removals)
+        # Listing the combinations also enforces the bounds
+        domains = csp.curr_domains
+        cells = sorted(self.cells, key=lambda c: len(domains[c]))
+        values = [[(w, int(w)) for w in domains[c]] for c in cells]
+        seen = [set() for _c in cells]
+
+        def combinations(k, remaining, used):
+            """Mark the values of cells[k:] that complete a combination."""
+            if k == len(cells):
+                return remaining == 0
+            found = False
+            for w, n in values[k]:
+                if n <= remaining and w not in used:
+                    if combinations(k + 1, remaining - n, used + w):
+                        seen[k].add(w)
+                        found = True
+            return found
+
+        if not combinations(0, self.total, ''):
+            return None
+        changed = []
+        for c, keep in zip(cells, seen):
+            if len(keep) < len(domains[c]):
+                for v in domains[c][:]:
+                    if v not in keep:
+                        csp.prune(c, v, removals)
+                changed.append(c)
+        return changed
+
+
+class ProductCage(Cage):
+    """Cells multiply to total (KenKen 'x').  Values must be positive."""
+
+    combine = staticmethod(prod)
+
+    def fits(self, v, rest_lo, rest_hi):
+        return self.total % v == 0 and rest_lo <= self.total // v <= rest_hi
+
+
+class KillerSudoku(Sudoku):
+    """A Killer Sudoku: a Sudoku whose grid is also split into cages.  The
+    digits of a cage add up to its total and are all different.
+
+    cages - list of (total, positions) pairs, positions being indices
+        0..80 into the grid string, row by row
+    grid - givens in the Sudoku format (default none)
+
+    The all-different part of each cage is added to the neighbors as
+    ordinary binary arcs; the sums are SumCage propagators that AC3 runs
+    alongside the arcs.  These also use the all-different rule when
+    looking for support.
+    """
+
+    cages = ()   # Until __init__ has made them (see new_assignment)
+
+    def __init__(self, cages, grid='.' * 81):
+        Sudoku.__init__(self, grid)
+        cells = flatten(self.rows)
+        self.cages = [SumCage(total, [cells[p] for p in positions], distinct=True)
+                      for total, positions in cages]
+        # Own copy of neighbors; the Sudoku layout is shared
+        self.neighbors = {v: set(n) for v, n in self.neighbors.items()}
+        for cage in self.cages:
+            for v in cage.cells:
+                self.neighbors[v].update(c for c in cage.cells if c != v)
+                self.propagators.setdefault(v, []).append(cage)
+        self.supports = self.different_values_supports()
+        self.count_candidates()   # Again, so the assignment knows the cages
+
+    def new_assignment(self):
+        """An ArrayAssignment that also checks that the digits of each
+        cage are different: the cages are numbered after the Sudoku units."""
+        groups = [list(units) for units in self.cell_units]
+        for i, cage in enumerate(self.cages, len(self.units)):
+            for v in cage.cells:
+                groups[v].append(i)
+        return ArrayAssignment(len(groups), groups,
+                               len(self.units) + len(self.cages), DIGIT_INDEX)
+
+    def goal_test(self, state):
+        """Sudoku rules plus every cage total."""
+        assignment = dict(state)
+        return (Sudoku.goal_test(self, state) and
+                all(cage.satisfied(assignment) for cage in self.cages))
+
+
+def random_cages(solution, max_size=4):
+    """Cut a solved grid (81 character string) into random Killer Sudoku
+    cages of 2..max_size orthogonally connected cells with different
+    digits (a cage is smaller if it runs out of room).  Returns a list of
+    (total, positions) pairs for KillerSudoku.  The puzzle is solvable
+    but not necessarily uniquely.  Uses the module level random
+    generator."""
+
+    def adjacent(p):
+        r, c = divmod(p, 9)
+        return [9 * r2 + c2 for r2, c2 in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                if 0 <= r2 < 9 and 0 <= c2 < 9]
+
+    free = set(range(81))
+    cages = []
+    for p in random.sample(range(81), 81):
+        if p not in free:
+            continue
+        free.discard(p)
+        cage = [p]
+        size = random.randint(2, max_size)
+        while len(cage) < size:
+            digits = {solution[q] for q in cage}
+            frontier = [q for c in cage for q in adjacent(c)
+                        if q in free and solution[q] not in digits]
+            if not frontier:
+                break
+            q = random.choice(frontier)
+            free.discard(q)
+            cage.append(q)
+        cages.append((sum(int(solution[q]) for q in cage), sorted(cage)))
+    return cages
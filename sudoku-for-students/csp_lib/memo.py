@@ -0,0 +1,111 @@
+# ______________________________________________________________________________
+# Transposition table: remembered propagation fixpoints
+
+import random
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """A size bounded map from search states to what propagation did
+    there.  When full, the least recently used entry is dropped.
+
+    maxsize - most entries kept
+
+    hits, misses and evictions count lookups and drops; stats() returns
+    them with the hit rate, e.g. to print after a search.  A search in
+    another process works on its own copy of the table and can send its
+    counts() back to be added with add_counts().
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the entry for key, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def counts(self):
+        return (self.hits, self.misses, self.evictions)
+
+    def add_counts(self, counts, since=(0, 0, 0)):
+        """Add the counts of a copy of the table, less the counts it had
+        when it was copied."""
+        hits, misses, evictions = (n - m for n, m in zip(counts, since))
+        self.hits += hits
+        self.misses += misses
+        self.evictions += evictions
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self.entries),
+                'hit_rate': self.hit_rate()}
+
+
+def zobrist_keys(csp, seed=0):
+    """Return {var: {val: key}} with a random 64 bit key for each value of
+    each variable.  Uses its own generator, so the module level random
+    (and with it the searches' tie breaking) is not disturbed."""
+    rng = random.Random(seed)
+    return {var: {val: rng.getrandbits(64) for val in csp.domains[var]}
+            for var in csp.variables}
+
+
+def memoize(csp, maxsize=100000, seed=0):
+    """Make mac (and mac_unit_rules) on csp remember their results.
+
+    csp.state_hash becomes the xor of the Zobrist keys of the values
+    pruned so far, which prune and restore update in constant time per
+    value.  Returns the new csp.memo table.  Two different states with the
+    same 64 bit hash would be confused, which is unlikely enough to
+    ignore.
+    """
+    csp.support_pruning()
+    csp.zobrist = zobrist_keys(csp, seed)
+    csp.rehash()
+    csp.memo = TranspositionTable(maxsize)
+    return csp.memo
+
+
+def memo_propagate(csp, propagate, var, queue, removals):
+    """Call propagate(csp, queue, removals) (e.g. AC3) after var has been
+    assigned, unless csp.memo already knows the outcome from this state.
+    The table keeps the values propagation pruned, or False if it failed,
+    so a hit prunes them again (through csp.prune, so removals and the
+    bookkeeping of subclasses stay right) without checking any
+    constraint."""
+    key = (csp.state_hash, var)
+    entry = csp.memo.get(key)
+    if entry is None:
+        start = len(removals)
+        result = propagate(csp, queue, removals)
+        csp.memo.put(key, tuple(removals[start:]) if result else False)
+        return result
+    if entry is False:
+        return False
+    for B, b in entry:
+        csp.prune(B, b, removals)
+    return True
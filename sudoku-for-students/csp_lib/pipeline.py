@@ -0,0 +1,121 @@
+# ______________________________________________________________________________
+# Adaptive solving: cheap propagation first, search only when it is needed
+
+from .backtrack_util import mrv, unordered_domain_values, mac, mac_unit_rules
+from .constraint_prop import AC3, naked_singles, unit_rules
+from .backtrack import backtracking_search
+from .util import tic, tock
+
+# Stages in the order they are tried, cheapest first
+STAGES = ('singles', 'ac3', 'unit', 'search')
+
+PROPAGATORS = {'singles': naked_singles, 'ac3': AC3, 'unit': unit_rules}
+
+# Learned by benchmarks/bench_pipeline.py (learn_thresholds over every
+# stage of half of its 60 generated puzzles, 20 per generator level).
+# After naked singles AC3 never removed anything from a Sudoku, so it only
+# costs time and is always skipped.  The unit rules save more search time
+# than they take at any progress, so they always run.
+DEFAULT_THRESHOLDS = {'singles': 0.0, 'ac3': float('inf'), 'unit': 0.0}
+
+
+def candidates(csp):
+    """Number of values left in all of csp's domains."""
+    return sum(len(csp.curr_domains[v]) for v in csp.variables)
+
+
+def adaptive_solve(csp, thresholds=None):
+    """Solve csp (a Sudoku) in stages: naked singles, AC3, the unit rules
+    and finally backtracking search, stopping at the first stage that
+    leaves every variable with one value.
+
+    Before each propagation stage the progress so far is measured as the
+    fraction of the candidates removed since the start.  The stage is
+    skipped if that is below thresholds[stage] (missing stages have
+    threshold 0, i.e. always run); {} runs every stage, e.g. to record
+    statistics for learn_thresholds.  thresholds defaults to
+    DEFAULT_THRESHOLDS.  The search uses mac_unit_rules, or plain mac if
+    the unit rules stage ran and found nothing to prune on this puzzle.
+
+    Returns (assignment, level, stages): assignment is "Failure" if there
+    is no solution, level the stage that finished (None on failure) and
+    stages a list of [stage, candidates before, values pruned, seconds]
+    for the stages that ran.
+    """
+    if thresholds is None:
+        thresholds = DEFAULT_THRESHOLDS
+    csp.support_pruning()
+    initial = candidates(csp)
+    stages = []
+    before = initial
+    for stage in STAGES[:-1]:
+        if (initial - before) / initial < thresholds.get(stage, 0.0):
+            continue
+        start = tic()
+        consistent = PROPAGATORS[stage](csp)
+        after = candidates(csp)
+        stages.append([stage, before, before - after, round(tock(start), 6)])
+        before = after
+        if not consistent:
+            return "Failure", None, stages
+        if after == len(csp.variables):
+            return dict(csp.infer_assignment().items()), stage, stages
+
+    inference = mac_unit_rules
+    if any(stage == 'unit' and not pruned for stage, _before, pruned, _seconds in stages):
+        inference = mac
+    start = tic()
+    nassigns = csp.nassigns
+    assignment = backtracking_search(csp, mrv, unordered_domain_values, inference)
+    # Search reports the assignments it made instead of values pruned
+    stages.append(['search', before, csp.nassigns - nassigns, round(tock(start), 6)])
+    if assignment == "Failure":
+        return assignment, None, stages
+    return assignment, 'search', stages
+
+
+def learn_thresholds(records):
+    """Learn thresholds for adaptive_solve from result records (see
+    results.py) that have stages, best recorded with thresholds {} so that
+    every stage ran.
+
+    Values a stage prunes are worth the search time they save.  That is
+    estimated as the recorded search seconds per candidate left for the
+    search, over all records that searched.  So running a stage nets
+    seconds - pruned * that rate.  A stage's threshold is the progress
+    (fraction of the candidates removed before the stage) at or above
+    which running it would have given the least total net time over the
+    records.  It is infinite if the stage never paid for itself.  Stages
+    with no data, or every stage if no record searched, are left out,
+    i.e. always run.
+    """
+    runs = {}       # stage -> [(progress, seconds, pruned)]
+    search_seconds = search_candidates = 0
+    for record in records:
+        stages = record.get('stages')
+        if not stages:
+            continue
+        initial = stages[0][1]
+        for stage, before, pruned, seconds in stages:
+            if stage in PROPAGATORS:
+                runs.setdefault(stage, []).append(((initial - before) / initial, seconds, pruned))
+            else:
+                search_seconds += seconds
+                search_candidates += before
+    if not search_candidates:
+        return {}
+    rate = search_seconds / search_candidates
+
+    thresholds = {}
+    for stage, samples in runs.items():
+        samples.sort()
+        # Net time of running the stage at each sample's progress and above
+        best, threshold = 0.0, float('inf')
+        net = 0.0
+        for i in range(len(samples) - 1, -1, -1):
+            progress, seconds, pruned = samples[i]
+            net += seconds - pruned * rate
+            if net <= best and (i == 0 or samples[i - 1][0] < progress):
+                best, threshold = net, progress
+        thresholds[stage] = 0.0 if threshold == samples[0][0] else threshold
+    return thresholds
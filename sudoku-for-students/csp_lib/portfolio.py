@@ -0,0 +1,116 @@
+# ______________________________________________________________________________
+# Portfolio solving: race differently configured searches on one problem
+
+import random
+import traceback
+from collections import namedtuple
+from multiprocessing import Process, Queue
+from queue import Empty
+
+from .backtrack_util import (first_unassigned_variable, mrv,
+                             unordered_domain_values,
+                             forward_checking, mac)
+from .util import tic, tock
+from .constraint_prop import AC3
+from .backtrack import backtracking_search
+
+
+class SolverConfig(namedtuple('SolverConfig', 'select inference seed')):
+    """One member of a portfolio: variable ordering, inference and the seed
+    for the random module (used by argmin_random_tie in mrv)."""
+
+    @property
+    def name(self):
+        return "{}+{} seed={}".format(self.select.__name__,
+                                      self.inference.__name__, self.seed)
+
+
+DEFAULT_PORTFOLIO = [
+    SolverConfig(mrv, mac, 0),
+    SolverConfig(mrv, forward_checking, 0),
+    SolverConfig(first_unassigned_variable, mac, 0),
+    SolverConfig(mrv, mac, 1),
+    SolverConfig(mrv, forward_checking, 1),
+    SolverConfig(mrv, mac, 2),
+]
+
+
+def _run(index, config, csp, results):
+    """Process body: solve this process's copy of csp and report back
+    (index, assignment, nassigns, seconds, error, memo counts), where error
+    is the traceback if the search raised, else None, and memo counts
+    are None without a csp.memo."""
+    random.seed(config.seed)
+    start = tic()
+    try:
+        assignment = backtracking_search(csp, config.select,
+                                         unordered_domain_values, config.inference)
+        error = None
+    except Exception:
+        assignment, error = None, traceback.format_exc()
+    counts = None if csp.memo is None else csp.memo.counts()
+    results.put((index, assignment, csp.nassigns, tock(start), error, counts))
+
+
+def portfolio_search(csp, configs=None):
+    """Race the configurations in configs (default DEFAULT_PORTFOLIO), each
+    in its own process on its own copy of csp.  The first search to finish
+    wins and the others are terminated.  csp is made arc consistent with
+    AC3 before the race starts (as driver.py does) but is not searched.
+
+    Returns (config, assignment, nassigns, seconds) for the winner, where
+    assignment is "Failure" if the winner proved there is no solution.
+    config is None if AC3 alone showed there is no solution.  If csp has
+    a memo (see memo.memoize) each search uses its own copy, and the
+    winner's lookups are added to the counts of csp.memo.  A
+    configuration that raises drops out of the race; if all of them do
+    (or die), RuntimeError is raised with the first traceback.
+    """
+    configs = configs or DEFAULT_PORTFOLIO
+    if not AC3(csp):
+        return None, "Failure", 0, 0.0
+    results = Queue()
+    memo_counts = None if csp.memo is None else csp.memo.counts()
+    workers = [Process(target=_run, args=(i, config, csp, results), daemon=True)
+               for i, config in enumerate(configs)]
+    for w in workers:
+        w.start()
+    errors = {}
+    try:
+        while len(errors) < len(workers):
+            try:
+                index, assignment, nassigns, seconds, error, counts = results.get(timeout=0.1)
+            except Empty:
+                if any(w.is_alive() for w in workers):
+                    continue
+                # All exited; what they sent has been flushed by now
+                try:
+                    index, assignment, nassigns, seconds, error, counts = results.get(timeout=0.1)
+                except Empty:
+                    raise RuntimeError("Portfolio workers died without a result "
+                                       "(exit codes {})".format(
+                                           [w.exitcode for w in workers]))
+            if error is None:
+                if counts is not None:
+                    csp.memo.add_counts(counts, memo_counts)
+                return configs[index], assignment, nassigns, seconds
+            errors[index] = error
+        first = min(errors)
+        raise RuntimeError("Every portfolio search failed; {} raised:\n{}".format(
+            configs[first].name, errors[first]))
+    finally:
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+        for w in workers:
+            w.join()
+
+
+if __name__ == '__main__':
+    from .sudoku import Sudoku, harder1
+
+    s = Sudoku(harder1)
+    config, assignment, nassigns, seconds = portfolio_search(s)
+    print("Winner: {} ({} assignments, {:.3f} seconds)".format(
+        config.name, nassigns, seconds))
+    s.display(assignment)
@@ -0,0 +1,99 @@
+# ______________________________________________________________________________
+# Machine readable results: one JSON object per line
+
+import json
+
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable'
+INVALID = 'invalid'
+
+
+def result_record(puzzle, solution, seconds, nodes, level, stages=None, memo=None):
+    """Return the record of one solved (or failed) puzzle as a dict.
+
+    puzzle - the 81 character grid as given
+    solution - 81 character grid string, or None if there is none
+    seconds - time spent solving
+    nodes - search assignments made (csp.nassigns)
+    level - the stage that finished the puzzle, one of pipeline.STAGES
+        ('singles', 'ac3', 'unit' or 'search'), or None on failure
+    stages - optional per stage statistics from pipeline.adaptive_solve,
+        kept in the record if given
+    memo - optional transposition table statistics (memo.memoize,
+        TranspositionTable.stats()), kept in the record if given
+    """
+    record = {'puzzle': puzzle,
+              'solution': solution,
+              'status': UNSOLVABLE if solution is None else SOLVED,
+              'seconds': round(seconds, 6),
+              'nodes': nodes,
+              'level': level}
+    if stages is not None:
+        record['stages'] = stages
+    if memo is not None:
+        record['memo'] = memo
+    return record
+
+
+def invalid_record(puzzle, error):
+    """Return the record of a puzzle that could not be read, e.g. a line
+    that is not an 81 square grid.  error says why."""
+    return {'puzzle': puzzle,
+            'solution': None,
+            'status': INVALID,
+            'seconds': 0.0,
+            'nodes': 0,
+            'level': None,
+            'error': error}
+
+
+class ResultWriter:
+    """Write records as JSON lines to a text file, e.g. sys.stdout.
+
+    Lines are encoded as the records come but written to the file in bulk,
+    buffer_size records at a time, so the writing keeps up with solvers
+    running in many processes.  flush() (or leaving a with block) writes
+    the rest; the file itself is not closed.
+
+        with ResultWriter(sys.stdout) as out:
+            for record in records:
+                out.write(record)
+    """
+
+    def __init__(self, file, buffer_size=1000):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.lines = []
+        self.count = 0
+        self.encode = json.JSONEncoder(separators=(',', ':')).encode
+
+    def write(self, record):
+        self.lines.append(self.encode(record))
+        self.count += 1
+        if len(self.lines) >= self.buffer_size:
+            self.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        if self.lines:
+            self.lines.append('')   # Newline after the last line too
+            self.file.write('\n'.join(self.lines))
+            self.lines = []
+        self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+def read_results(path):
+    """Yield the records of a JSON lines file written by ResultWriter."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,115 @@
+# ______________________________________________________________________________
+# Search space splitting (cube and conquer): one problem, many processes
+
+from multiprocessing import Pool, cpu_count
+
+from .backtrack_util import mrv, unordered_domain_values, mac
+from .constraint_prop import AC3
+from .backtrack import backtracking_search, count_solutions
+
+
+def split(csp, ncubes, select_unassigned_variable=mrv):
+    """Split the search space below the current state of csp into at least
+    ncubes disjoint subproblems (cubes), unless the space runs out first.
+
+    Each round branches every open cube on the variable chosen by
+    select_unassigned_variable, one child per remaining value, and keeps
+    the children that survive AC3.  Returns a list of csp.snapshot()
+    values; csp is left in its original state.
+    """
+    start = csp.snapshot()
+    if not AC3(csp):
+        csp.restore_snapshot(start)
+        return []
+    cubes = [csp.snapshot()]
+    while len(cubes) < ncubes:
+        children = []
+        branched = False
+        for cube in cubes:
+            csp.restore_snapshot(cube)
+            assignment = csp.infer_assignment()
+            if len(assignment) == len(csp.variables):
+                children.append(cube)   # Already solved, nothing to split
+                continue
+            branched = True
+            var = select_unassigned_variable(assignment, csp)
+            for val in list(csp.curr_domains[var]):
+                removals = csp.suppose(var, val)
+                csp.nassigns += 1
+                if AC3(csp, [(X, var) for X in csp.neighbors[var]], removals):
+                    children.append(csp.snapshot())
+                csp.restore(removals)
+        cubes = children
+        if not branched:
+            break
+    csp.restore_snapshot(start)
+    return cubes
+
+
+# Each pool process keeps its own copy of the problem; only cubes travel.
+_worker_csp = None
+
+
+def _init_worker(csp):
+    global _worker_csp
+    _worker_csp = csp
+
+
+def _memo_counts():
+    memo = _worker_csp.memo
+    return None if memo is None else memo.counts()
+
+
+def _solve_cube(cube):
+    _worker_csp.restore_snapshot(cube)
+    nassigns = _worker_csp.nassigns
+    counts = _memo_counts()
+    result = backtracking_search(_worker_csp, mrv, unordered_domain_values, mac)
+    return result, _worker_csp.nassigns - nassigns, counts, _memo_counts()
+
+
+def _count_cube(cube):
+    _worker_csp.restore_snapshot(cube)
+    counts = _memo_counts()
+    return (count_solutions(_worker_csp, mrv, unordered_domain_values, mac),
+            counts, _memo_counts())
+
+
+def split_search(csp, processes=None, cubes_per_process=8):
+    """Solve csp by splitting it into cubes and handing them to a pool of
+    processes (default: one per core).
+
+    There are several cubes per process and each process takes a new cube
+    as soon as it finishes one, so a process that drew an easy subtree
+    picks up the remaining work instead of sitting idle.  The first
+    solution found wins and the pool is terminated.
+
+    Returns the assignment, or "Failure" if no cube has a solution.
+    csp.nassigns counts the assignments of the splitting and of the cubes
+    searched until then, and so does csp.memo (if any, see memo.memoize)
+    with the lookups of the pool processes' copies.
+    """
+    processes = processes or cpu_count()
+    cubes = split(csp, processes * cubes_per_process)
+    with Pool(processes, _init_worker, (csp,)) as pool:
+        for result, nassigns, before, after in pool.imap_unordered(_solve_cube, cubes):
+            csp.nassigns += nassigns
+            if after is not None:
+                csp.memo.add_counts(after, before)
+            if result != "Failure":
+                return result
+    return "Failure"
+
+
+def split_count(csp, processes=None, cubes_per_process=8):
+    """Exhaustive counterpart of split_search: count all solutions of csp
+    by summing count_solutions over the cubes."""
+    processes = processes or cpu_count()
+    cubes = split(csp, processes * cubes_per_process)
+    found = 0
+    with Pool(processes, _init_worker, (csp,)) as pool:
+        for count, before, after in pool.imap_unordered(_count_cube, cubes):
+            found += count
+            if after is not None:
+                csp.memo.add_counts(after, before)
+    return found
@@ -1,16 +1,23 @@
 # Sudoku
 
 import itertools
-import re
 from functools import reduce
 
-from .csp import CSP
+from .csp import CSP, SINGLETON, WIPEOUT
+from .assignment import ArrayAssignment
 
 def flatten(seqs):
     """flatten(seqs)
-    Flattens objects in 
+    Flattens a sequence of sequences (lists or tuples) into one list
     """
-    return sum(seqs, [])
+    return list(itertools.chain.from_iterable(seqs))
+
+
+def freeze(seqs):
+    """Return nested lists (or tuples) as nested tuples."""
+    if isinstance(seqs, (list, tuple)):
+        return tuple(map(freeze, seqs))
+    return seqs
 
 
 easy1 = '..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..'
@@ -18,6 +25,10 @@ harder1 = '4173698.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2..
 
 
 
+DIGITS = '123456789'
+DIGIT_INDEX = {d: i for i, d in enumerate(DIGITS)}
+
+
 def different_values_constraint(_A, a, _B, b):
     """A constraint saying two neighboring variables must differ in value."""
     return a != b
@@ -108,14 +119,69 @@ class Sudoku(CSP):
 
     
     R3 = list(range(3)) # All Sudoku puzzles use 3x3 grids, one side
+
+    # different_values_constraint only prunes once a neighbor is down to
+    # one value, so AC3 need not recheck arcs for other domain changes
+    arc_events = SINGLETON
+
+    _layout = None      # Shared grid layout, see __init__
+    _supports = None    # Shared supports, see different_values_supports
     
     
     
     def __init__(self, grid):
         """Build a Sudoku problem from a string representing the grid:
         the digits 1-9 denote a filled cell, '.' or '0' an empty one;
-        other characters are ignored."""
+        other characters are ignored.  Raises ValueError unless there are
+        exactly 81 squares."""
         
+        # The grid layout is the same for every puzzle, so it is built once
+        # and shared.  It is made of tuples and frozensets so that no puzzle
+        # can change it for the others; a subclass that needs different
+        # neighbors makes its own dictionary (see KillerSudoku).
+        if Sudoku._layout is None:
+            self._build_layout()
+            Sudoku._layout = (freeze(self.bgrid), freeze(self.boxes),
+                              freeze(self.rows), freeze(self.cols),
+                              freeze(self.units),
+                              {v: frozenset(n) for v, n in self.neighbors.items()},
+                              freeze(self.cell_units))
+        (self.bgrid, self.boxes, self.rows, self.cols,
+         self.units, self.neighbors, self.cell_units) = Sudoku._layout
+        squares = iter([ch for ch in grid if ch in '0123456789.'])
+        domains = {var: [ch] if ch in '123456789' else '123456789'
+                   for var, ch in zip(flatten(self.rows), squares)}
+        for _ in squares:
+            raise ValueError("Not a Sudoku grid", grid)  # Too many squares
+        if len(domains) < len(self.cell_units):
+            raise ValueError("Not a Sudoku grid", grid)  # Too few squares
+        CSP.__init__(self, None, domains, self.neighbors, different_values_constraint)
+        
+        self.support_pruning()
+        self.supports = self.different_values_supports()
+        self.count_candidates()
+
+    def different_values_supports(self):
+        """Supports (see CSP) for different_values_constraint: a is
+        supported by every value but itself.  Every arc has the same
+        supports, so one dictionary is shared by all arcs and puzzles."""
+        bits = self.value_bits()
+        layout_neighbors = Sudoku._layout[5]
+        if Sudoku._supports is None or Sudoku._supports[0] != bits:
+            everything = sum(bits.values())
+            per_value = {a: everything & ~bit for a, bit in bits.items()}
+            arcs = {(A, B): per_value
+                    for A in layout_neighbors for B in layout_neighbors[A]}
+            Sudoku._supports = (bits, per_value, arcs)
+        _bits, per_value, arcs = Sudoku._supports
+        if self.neighbors is not layout_neighbors:
+            # Extra different-value constraints (e.g. Killer cages)
+            arcs = {(A, B): per_value
+                    for A in self.neighbors for B in self.neighbors[A]}
+        return arcs
+
+    def _build_layout(self):
+        """Number the cells and work out the units and neighbors."""
         # Generate board of fixed size 3x3 sets of 3x3 boxes
         # Use Cell to generate integers for each box (variables are numbers)
         self.Cell = itertools.count().__next__
@@ -156,6 +222,14 @@ class Sudoku(CSP):
         self.rows = flatten([list(map(flatten, zip(*brow))) for brow in self.bgrid])
         # list of variables in each column
         self.cols = list(zip(*self.rows)) 
+        # list of every unit (box, row, column); each must hold 1..9 once
+        self.units = self.boxes + self.rows + self.cols
+        # indices into self.units of the three units of each cell,
+        # self.cell_units[v] for cell v (cells are numbered from 0)
+        self.cell_units = [[] for _v in flatten(self.rows)]
+        for u, unit in enumerate(self.units):
+            for v in unit:
+                self.cell_units[v].append(u)
         
         # Build the neighbors list
         # It should be implemented as a dictionary.
@@ -176,15 +250,153 @@ class Sudoku(CSP):
         for unit in map(set, self.boxes + self.rows + self.cols):
             for v in unit:
                 self.neighbors[v].update(unit - {v})
-                
-        squares = iter(re.findall(r'\d|\.', grid))
-        domains = {var: [ch] if ch in '123456789' else '123456789'
-                   for var, ch in zip(flatten(self.rows), squares)}
-        for _ in squares:
-            raise ValueError("Not a Sudoku grid", grid)  # Too many squares
-        CSP.__init__(self, None, domains, self.neighbors, different_values_constraint)
-        
-        self.support_pruning()
+
+    # Candidate counts.  unit_counts[9 * u + d] is the number of cells of
+    # self.units[u] that still have digit DIGITS[d] in their domain.  The
+    # counts follow every prune, suppose and restore, so the unit rules
+    # need not rescan domains: a count of 1 is a hidden single and a count
+    # of 0 means the puzzle cannot be finished from here.  Counts that
+    # reached 0 or 1 since unit_singles was last called are kept in
+    # pending_units, and restore adds the counts of 1 of cells that it
+    # makes undecided again.  So unit_singles finds every hidden single,
+    # even after backtracking to a state the unit rules were never
+    # applied to.
+    #
+    # self.assignment is an ArrayAssignment of the cells whose domain is a
+    # single value, kept up to date the same way; infer_assignment returns
+    # it without looking at the domains.
+
+    def count_candidates(self):
+        """Count unit_counts and build self.assignment from scratch."""
+        counts = [0] * (9 * len(self.units))
+        self.assignment = self.new_assignment()
+        for var, units in enumerate(self.cell_units):
+            domain = self.curr_domains[var]
+            for val in domain:
+                d = DIGIT_INDEX[val]
+                for u in units:
+                    counts[9 * u + d] += 1
+            if len(domain) == 1:
+                self.assignment[var] = domain[0]
+        self.unit_counts = counts
+        self.pending_units = {i for i, n in enumerate(counts) if n <= 1}
+
+    def new_assignment(self):
+        """An empty ArrayAssignment that checks the Sudoku units."""
+        return ArrayAssignment(len(self.cell_units), self.cell_units,
+                               len(self.units), DIGIT_INDEX)
+
+    def sync_assignment(self, var):
+        """Bring self.assignment[var] in line with var's domain."""
+        domain = self.curr_domains[var]
+        if len(domain) == 1:
+            self.assignment[var] = domain[0]
+        elif var in self.assignment:
+            del self.assignment[var]
+
+    def uncount(self, var, value):
+        """Update the counts for value leaving var's domain."""
+        counts = self.unit_counts
+        d = DIGIT_INDEX[value]
+        for u in self.cell_units[var]:
+            i = 9 * u + d
+            counts[i] -= 1
+            if counts[i] <= 1:
+                self.pending_units.add(i)
+                if not counts[i] and self.events is not None:
+                    # value has no place left in this unit
+                    self.events[var] = self.events.get(var, 0) | WIPEOUT
+
+    def prune(self, var, value, removals=None):
+        CSP.prune(self, var, value, removals)
+        self.uncount(var, value)
+        if len(self.curr_domains[var]) <= 1:
+            self.sync_assignment(var)
+
+    def suppose(self, var, value):
+        removals = CSP.suppose(self, var, value)
+        for B, b in removals:
+            self.uncount(B, b)
+        self.assignment[var] = value
+        return removals
+
+    def restore(self, removals):
+        CSP.restore(self, removals)
+        counts = self.unit_counts
+        undecided = []
+        for B, b in removals:
+            d = DIGIT_INDEX[b]
+            for u in self.cell_units[B]:
+                counts[9 * u + d] += 1
+            if B in self.assignment and len(self.curr_domains[B]) > 1:
+                undecided.append(B)
+            self.sync_assignment(B)
+        # unit_singles passed over digits whose last place was a decided
+        # cell; those are hidden singles again
+        for B in undecided:
+            for val in self.curr_domains[B]:
+                d = DIGIT_INDEX[val]
+                for u in self.cell_units[B]:
+                    if counts[9 * u + d] == 1:
+                        self.pending_units.add(9 * u + d)
+
+    def goal_test(self, state):
+        """Every cell assigned and no digit twice in a unit.  Counts the
+        digits of each unit in an ArrayAssignment instead of checking the
+        constraint between every pair of neighbors."""
+        assignment = self.new_assignment()
+        for var, val in state:
+            if assignment.conflicts(var, val):
+                return False
+            assignment[var] = val
+        return len(assignment) == len(self.variables)
+
+    def infer_assignment(self):
+        """The cells whose domain is a single value.  This is the live
+        self.assignment, not a copy: it changes as the domains do."""
+        return self.assignment
+
+    def restore_snapshot(self, snap):
+        CSP.restore_snapshot(self, snap)
+        self.count_candidates()
+
+    def unit_singles(self):
+        """Return the hidden singles, [(var, value), ...] for each digit
+        that has one undecided cell left in a unit, or None if a digit has
+        no cell left in some unit.  Only looks at pending_units, the
+        counts that may have become hidden singles since the last call.
+        On failure they stay pending, for the state search backtracks to."""
+        counts = self.unit_counts
+        domains = self.curr_domains
+        singles = []
+        for i in self.pending_units:
+            if not counts[i]:
+                return None
+            if counts[i] == 1:
+                u, d = divmod(i, 9)
+                val = DIGITS[d]
+                for var in self.units[u]:
+                    if val in domains[var]:
+                        if len(domains[var]) > 1:
+                            singles.append((var, val))
+                        break
+        self.pending_units = set()
+        return singles
+
+    def __getstate__(self):
+        """Pickle support (e.g. to hand a puzzle to another process).
+        The Cell counter is only needed while building the grid and
+        cannot be pickled."""
+        state = self.__dict__.copy()
+        state.pop('Cell', None)
+        return state
+
+    def to_string(self, assignment):
+        """Return the 81 character grid string for assignment, row by row,
+        with '.' for unassigned cells.  This is the same format accepted
+        by the constructor."""
+        return ''.join(str(assignment.get(cell, '.'))
+                       for cell in flatten(self.rows))
 
     def display(self, assignment):
         def show_box(box): return [' '.join(map(show_cell, row)) for row in box]
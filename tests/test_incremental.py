@@ -0,0 +1,126 @@
+"""Checks of the state Sudoku keeps up to date incrementally: the unit
+counts, the live assignment and the Zobrist hash are recomputed from the
+domains at every node of a search and compared.  Run from the repository
+root:
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'sudoku-for-students'))
+
+from csp_lib.sudoku import DIGITS, Sudoku, easy1, harder1
+from csp_lib.killer import KillerSudoku
+from csp_lib.backtrack import count_solutions
+from csp_lib.backtrack_util import mac, mac_unit_rules, mrv, unordered_domain_values
+from csp_lib.constraint_prop import AC3, unit_singles
+from csp_lib.memo import memoize
+from csp_lib.split import split_count
+
+# easy1 with its first row and a bit emptied: 294 solutions, a few hundred
+# search nodes after AC3
+OPEN = '.' * 12 + easy1[12:]
+
+EASY1_SOLUTION = ('483921657967345821251876493548132976729564138'
+                  '136798245372689514814253769695417382')
+
+# Cages over the top left box, for KillerSudoku with the first 21 cells empty
+CAGES = [(sum(int(EASY1_SOLUTION[p]) for p in positions), positions)
+         for positions in ([0, 1], [9, 10], [2, 11, 20], [18, 19])]
+
+
+def searched(csp, inference, check):
+    """Make csp arc consistent and count its solutions with inference,
+    calling check(csp) before and after inference at every node and once
+    more at the end.  Returns the number of solutions."""
+    def checked(csp, var, value, assignment, removals):
+        check(csp)
+        result = inference(csp, var, value, assignment, removals)
+        if result:
+            check(csp)
+        return result
+    assert AC3(csp)
+    found = count_solutions(csp, mrv, unordered_domain_values, checked)
+    check(csp)
+    return found
+
+
+def check_unit_counts(s):
+    counts = [0] * (9 * len(s.units))
+    for u, unit in enumerate(s.units):
+        for var in unit:
+            for val in s.curr_domains[var]:
+                counts[9 * u + DIGITS.index(val)] += 1
+    assert s.unit_counts == counts
+    # Whatever unit_singles should report must be pending
+    for i, n in enumerate(counts):
+        u, d = divmod(i, 9)
+        if n == 0 or n == 1 and any(DIGITS[d] in s.curr_domains[v] and len(s.curr_domains[v]) > 1
+                                    for v in s.units[u]):
+            assert i in s.pending_units
+
+
+def check_assignment(s):
+    fresh = s.new_assignment()
+    for var in s.variables:
+        if len(s.curr_domains[var]) == 1:
+            fresh[var] = s.curr_domains[var][0]
+    assert s.assignment.values == fresh.values
+    assert s.assignment.used == fresh.used
+    assert len(s.assignment) == len(fresh)
+
+
+def check_hash(s):
+    state_hash = s.state_hash
+    s.rehash()
+    assert s.state_hash == state_hash
+
+
+def test_unit_counts_follow_search():
+    for inference in (mac, mac_unit_rules):
+        assert searched(Sudoku(OPEN), inference, check_unit_counts) == 294
+
+
+def test_unit_counts_after_restore_snapshot():
+    s = Sudoku(harder1)
+    snap = s.snapshot()
+    AC3(s)
+    s.restore_snapshot(snap)
+    check_unit_counts(s)
+    check_assignment(s)
+
+
+def test_assignment_follows_search():
+    assert searched(Sudoku(OPEN), mac_unit_rules, check_assignment) == 294
+    killer = KillerSudoku(CAGES, '.' * 21 + easy1[21:])
+    assert searched(killer, mac, check_assignment) >= 1
+
+
+def test_state_hash_follows_search():
+    s = Sudoku(OPEN)
+    memoize(s)
+    assert searched(s, mac_unit_rules, check_hash) == 294
+
+
+def test_unit_rules_fixpoint_has_no_hidden_singles():
+    def fixpoint(s):
+        if s.pending_units:
+            return      # Only checked where the unit rules have run
+        assert unit_singles(s) == []
+
+    def inference(csp, var, value, assignment, removals):
+        result = mac_unit_rules(csp, var, value, assignment, removals)
+        if result:
+            assert unit_singles(csp) == []
+        return result
+    assert searched(Sudoku(OPEN), inference, fixpoint) == 294
+
+
+def test_split_count_matches_serial():
+    s = Sudoku(OPEN)
+    AC3(s)
+    serial = count_solutions(s, mrv, unordered_domain_values, mac)
+    assert split_count(Sudoku(OPEN), processes=2) == serial == 294